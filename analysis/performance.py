@@ -1,36 +1,90 @@
-import pandas as pd
+import os
+import csv
+import json
+from pathlib import Path
 import numpy as np
 from models.bandits import ThompsonBandit, UCB1Bandit
 
-def analyze_and_save_results(banditA, banditB, original_df, method):
+# pandas is imported inside the helpers that need it so the servers, which only
+# write a single results row while running, do not pay for importing it.
+
+DATA_PATH = Path("data")
+FAST_IO = os.environ.get("FAST_IO", "1") != "0" # Parquet decisions by default, FAST_IO=0 falls back to CSV
+
+if FAST_IO:
+   # Imported up front because the servers save from atexit, where threading has already
+   # shut down and a first import of pyarrow's thread pool machinery raises RuntimeError
+   import pyarrow as pa
+   import pyarrow.parquet as pq
+
+def _decisions_path(name):
+   return DATA_PATH / f"{name}.{'parquet' if FAST_IO else 'csv'}"
+
+def save_decisions(decisions, name):
+   """Save the per-view click outcomes of a simulation."""
+   if FAST_IO:
+       # Wrap the array's memory directly; pa.array would first import pyarrow's pandas
+       # compatibility layer, which fails for the same reason at shutdown
+       decisions = np.ascontiguousarray(decisions, dtype=np.uint8)
+       column = pa.Array.from_buffers(pa.uint8(), len(decisions), [None, pa.py_buffer(decisions)])
+       table = pa.Table.from_arrays([column], names=['decision'])
+       pq.write_table(table, _decisions_path(name))
+   else:
+       np.savetxt(_decisions_path(name), decisions, fmt='%d', header='decision', comments='')
+
+def load_decisions(name):
+   """Load the per-view click outcomes saved by save_decisions."""
+   if FAST_IO:
+       return pq.read_table(_decisions_path(name)).column('decision').to_numpy()
+   return np.loadtxt(_decisions_path(name), dtype=np.uint8, skiprows=1, ndmin=1)
+
+def load_results(method):
+   """Load the results row saved by analyze_and_save_results as a Series."""
+   import pandas as pd
+   return pd.read_csv(DATA_PATH / f'{method}_results.csv').iloc[0]
+
+def load_true_ctrs():
+   """Load the actual CTRs of the generated click data."""
+   with open(DATA_PATH / "true_ctrs.json") as f:
+       ctrs = json.load(f)
+   return ctrs["ctr_a"], ctrs["ctr_b"]
+
+def analyze_and_save_results(banditA, banditB, method):
    """Analyze performance and save results to CSV."""
-   # Calculate original CTRs
-   true_ctr_a = original_df[original_df['button']=='A']['action'].mean()
-   true_ctr_b = original_df[original_df['button']=='B']['action'].mean()
+   # Original CTRs, computed once by the data generator
+   true_ctr_a, true_ctr_b = load_true_ctrs()
    
    # Calculate actual CTRs
    bandit_ctr_a = banditA.clicks / banditA.views
    bandit_ctr_b = banditB.clicks / banditB.views
    
-   results = {
-       'algorithm': [method],
-       'true_ctr_a': [true_ctr_a],
-       'true_ctr_b': [true_ctr_b],
-       'bandit_ctr_a': [bandit_ctr_a],
-       'bandit_ctr_b': [bandit_ctr_b],
-       'button_a_clicks': [banditA.clicks],
-       'button_a_views': [banditA.views],
-       'button_b_clicks': [banditB.clicks],
-       'button_b_views': [banditB.views],
-   }
+   # (column, dtype, value) for the single results row
+   fields = [
+       ('algorithm', 'U16', method),
+       ('true_ctr_a', 'f8', true_ctr_a),
+       ('true_ctr_b', 'f8', true_ctr_b),
+       ('bandit_ctr_a', 'f8', bandit_ctr_a),
+       ('bandit_ctr_b', 'f8', bandit_ctr_b),
+       ('button_a_clicks', 'i8', banditA.clicks),
+       ('button_a_views', 'i8', banditA.views),
+       ('button_b_clicks', 'i8', banditB.clicks),
+       ('button_b_views', 'i8', banditB.views),
+   ]
    
    # Add algorithm-specific parameters
    if isinstance(banditA, ThompsonBandit):
-       results.update({
-           'a_alpha': [banditA.a_prior + banditA.clicks],
-           'a_beta': [banditA.b_prior + banditA.views - banditA.clicks],
-           'b_alpha': [banditB.a_prior + banditB.clicks],
-           'b_beta': [banditB.b_prior + banditB.views - banditB.clicks]
-       })
-   
+       fields += [
+           ('a_alpha', 'f8', banditA.a_prior + banditA.clicks),
+           ('a_beta', 'f8', banditA.b_prior + banditA.views - banditA.clicks),
+           ('b_alpha', 'f8', banditB.a_prior + banditB.clicks),
+           ('b_beta', 'f8', banditB.b_prior + banditB.views - banditB.clicks),
+       ]
+
+   results = np.array([tuple(value for _, _, value in fields)],
+                      dtype=[(name, dtype) for name, dtype, _ in fields])
+
+   with open(DATA_PATH / f'{method}_results.csv', 'w', newline='') as f:
+       writer = csv.writer(f)
+       writer.writerow(results.dtype.names)
+       writer.writerow(results[0].tolist())
    return results
\ No newline at end of file
@@ -1,49 +1,88 @@
+import math
 import numpy as np
 
+_rng = np.random.default_rng()
+
+class BanditPool:
+    """Beta-Bernoulli counters for several arms, stored as NumPy arrays."""
+    def __init__(self, n_arms, a_prior, b_prior):
+        self.clicks = np.zeros(n_arms, dtype=np.int32) # Successes per arm
+        self.views = np.zeros(n_arms, dtype=np.int32) # Trials per arm
+        self.a_prior = a_prior
+        self.b_prior = b_prior
+
+    def sample(self, size=None):
+        """One posterior sample per arm, or an (n_arms, size) block of them."""
+        a = self.a_prior + self.clicks
+        b = self.b_prior + self.views - self.clicks
+        if size is None:
+            return _rng.beta(a=a, b=b)
+        return _rng.beta(a=a[:, None], b=b[:, None], size=(len(a), size))
+
+    def add_click(self, i):
+        self.clicks[i] += 1
+
+    def add_view(self, i):
+        self.views[i] += 1
+
+
 class ThompsonBandit:
-    """Thompson Sampling implementation with Beta prior."""
-    def __init__(self, name, a_prior, b_prior, minimum_exploration):
-        self.clicks = 0 # Successes for Beta distribution
-        self.views = 0 # Total trials 
+    """Thompson Sampling implementation with Beta prior.
+
+    Counters are kept in arm `index` of `pool`, so bandits sharing a pool can be
+    sampled together. Without a pool the bandit gets its own single-arm pool.
+    """
+    def __init__(self, name, a_prior, b_prior, minimum_exploration, pool=None, index=0):
+        self.pool = pool if pool is not None else BanditPool(1, a_prior, b_prior)
+        self.index = index
         self.name = name
         self.a_prior = a_prior
         self.b_prior = b_prior
         self.minimum_exploration = minimum_exploration
 
+    @property
+    def clicks(self): # Successes for Beta distribution
+        return int(self.pool.clicks[self.index])
+
+    @property
+    def views(self): # Total trials
+        return int(self.pool.views[self.index])
+
     def sample(self):
         a = self.a_prior + self.clicks
         b = self.b_prior + self.views - self.clicks
-        return np.random.beta(a=a, b=b)
+        return _rng.beta(a=a, b=b)
     
     def add_click(self):
-        self.clicks += 1
+        self.pool.add_click(self.index)
 
     def add_view(self):
-        self.views += 1
+        self.pool.add_view(self.index)
 
 
 class UCB1Bandit:
     """Upper Confidence Bound (UCB1) implementation."""
     def __init__(self, name):
-        self.ctr_estimate = 0 # Running CTR estimate
         self.clicks = 0 # Total clicks
         self.views = 1 # Start at 1 to avoid division by zero
         self.name = name
 
     def sample(self, n_samples):
-        return self.ctr_estimate + np.sqrt(3 * np.log(n_samples) / self.views)
+        return self.sample_with_logn(math.log(n_samples))
+
+    def sample_with_logn(self, log_n):
+        """UCB1 bound given the precomputed log of the total number of views."""
+        return self.clicks / self.views + math.sqrt(3 * log_n / self.views)
     
     def add_click(self):
         self.clicks += 1
-        # Update running average
-        self.ctr_estimate = ((self.views - 1)*self.ctr_estimate + 1) / self.views
 
     def add_view(self):
         self.views += 1
 
     @staticmethod
     def is_exploring(bound_a, bound_b, n_total, min_views):
-        return abs(bound_a - bound_b) < np.sqrt(2 * np.log(n_total) / min_views)
+        return abs(bound_a - bound_b) < math.sqrt(2 * math.log(n_total) / min_views)
     
 
 class ClassicABTest:
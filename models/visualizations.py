@@ -1,78 +1,130 @@
 import matplotlib
 matplotlib.use('Agg')
 import matplotlib.pyplot as plt
-import seaborn as sns
 import numpy as np
+from scipy.stats import beta
 from pathlib import Path
 
+def posterior_mode(alpha, beta_):
+    """Mode of Beta(alpha, beta_), the CTR estimate shown in the legends.
+
+    The flat Beta(1, 1) of an arm with no views has no mode, so it falls back to its mean, 0.5.
+    """
+    alpha, beta_ = np.asarray(alpha, dtype=float), np.asarray(beta_, dtype=float)
+    denominator = alpha + beta_ - 2
+    return np.where(denominator > 0, (alpha - 1) / np.where(denominator > 0, denominator, 1), 0.5)
+
 class BanditVisualizer:
-   def plot_posterior(self, banditA, banditB, iteration, method):
+   def plot_posterior(self, snapshot, method):
        
-       """Create and save posterior distribution plot for both bandits."""
+       """Create and save posterior distribution plot for both bandits from a snapshot."""
       
-       # Calculate Beta distributions
-       a_dist = [np.random.beta(banditA.a_prior + banditA.clicks, banditA.b_prior + banditA.views - banditA.clicks) 
-                for _ in range(5000)]
-       b_dist = [np.random.beta(banditB.a_prior + banditB.clicks, banditB.b_prior + banditB.views - banditB.clicks) 
-                for _ in range(5000)]
-
-       plt.figure(figsize=(10, 6))
-
-       sns.kdeplot(data=a_dist, label=f'Button A (CTR: {(banditA.a_prior + banditA.clicks - 1) / (banditA.b_prior + banditA.views - 1):.3f})', 
-                   color='#f04b26', linewidth=2)
-       sns.kdeplot(data=b_dist, label=f'Button B (CTR: {(banditB.a_prior + banditB.clicks - 1) / (banditB.b_prior + banditB.views - 1):.3f})', 
-                   color='#5a18de', linewidth=2)
+       alpha_a, beta_a, alpha_b, beta_b, iteration = snapshot
+
+       # Evaluate the analytic PDFs over the range covering both posteriors
+       lower = beta.ppf(0.0005, [alpha_a, alpha_b], [beta_a, beta_b]).min()
+       upper = beta.ppf(0.9995, [alpha_a, alpha_b], [beta_a, beta_b]).max()
+       x = np.linspace(lower, upper, 500)
+       pdf_a = beta.pdf(x, alpha_a, beta_a)
+       pdf_b = beta.pdf(x, alpha_b, beta_b)
+
+       fig, ax = plt.subplots(figsize=(10, 6))
+
+       ax.plot(x, pdf_a, label=f'Button A (CTR: {float(posterior_mode(alpha_a, beta_a)):.3f})', 
+               color='#f04b26', linewidth=2)
+       ax.plot(x, pdf_b, label=f'Button B (CTR: {float(posterior_mode(alpha_b, beta_b)):.3f})', 
+               color='#5a18de', linewidth=2)
+       
+       ax.set_title(f'{method} Posterior Distributions after {iteration} iterations')
+       ax.set_xlabel('Click-through Rate (CTR)')
+       ax.set_ylabel('Density')
+       ax.legend()
+       fig.savefig(f'data/figures/posterior_{iteration}.png')
+       plt.close(fig)
+
+
+   def snapshot(self, banditA, banditB, iteration):
        
-       plt.title(f'{method} Posterior Distributions after {iteration} iterations')
-       plt.xlabel('Click-through Rate (CTR)')
-       plt.ylabel('Density')
-       plt.legend()
-       plt.savefig(f'data/figures/posterior_{iteration}.png')
-       plt.close()
+       """Capture the posterior parameters of both bandits for plot_posterior and create_grid."""
+
+       return (banditA.a_prior + banditA.clicks, banditA.b_prior + banditA.views - banditA.clicks,
+               banditB.a_prior + banditB.clicks, banditB.b_prior + banditB.views - banditB.clicks,
+               iteration)
 
 
-   def create_grid(self, method, save_path, iterations=[50, 150, 500, 1500, 3000, 5000]):
+   def create_grid(self, method, snapshots, save_path):
        
-       """Combine saved snapshots into a 2x3 grid."""
+       """Plot the posteriors of up to six snapshots into a 2x3 grid."""
+
+       alphas_a, betas_a, alphas_b, betas_b, iterations = (np.array(column) for column in zip(*snapshots))
+
+       # One x-range per snapshot (column), covering both posteriors
+       lower = np.minimum(beta.ppf(0.0005, alphas_a, betas_a), beta.ppf(0.0005, alphas_b, betas_b))
+       upper = np.maximum(beta.ppf(0.9995, alphas_a, betas_a), beta.ppf(0.9995, alphas_b, betas_b))
+       x = np.linspace(lower, upper, 500)
+       pdf_a = beta.pdf(x, alphas_a, betas_a)
+       pdf_b = beta.pdf(x, alphas_b, betas_b)
+
+       # Posterior modes, shown as the CTR estimate in the legends
+       mode_a = posterior_mode(alphas_a, betas_a)
+       mode_b = posterior_mode(alphas_b, betas_b)
 
-       _, axes = plt.subplots(2, 3, figsize=(20, 12))
+       fig, axes = plt.subplots(2, 3, figsize=(20, 12))
        
-       for idx, iteration in enumerate(iterations):
-           img = plt.imread(Path(save_path) / f'posterior_{iteration}.png')
-           ax = axes[idx//3, idx%3]
-           ax.imshow(img)
-           ax.axis('off')
-           ax.set_title(f'After {iteration} iterations')
+       for idx, ax in enumerate(axes.flat):
+           if idx >= len(iterations):
+               ax.axis('off')
+               continue
+           ax.plot(x[:, idx], pdf_a[:, idx], label=f'Button A (CTR: {mode_a[idx]:.3f})', color='#f04b26', linewidth=2)
+           ax.plot(x[:, idx], pdf_b[:, idx], label=f'Button B (CTR: {mode_b[idx]:.3f})', color='#5a18de', linewidth=2)
+           ax.set_title(f'After {iterations[idx]} iterations')
+           ax.set_xlabel('Click-through Rate (CTR)')
+           ax.set_ylabel('Density')
+           ax.legend()
        
-       plt.tight_layout()
-       plt.savefig(Path(save_path) / f'{method}_posterior_grid.png')
-       plt.close()
+       fig.suptitle(f'{method} Posterior Distributions')
+       fig.tight_layout()
+       fig.savefig(Path(save_path) / f'{method}_posterior_grid.png')
+       plt.close(fig)
 
    
+def cumulative_win_rates(decisions):
+
+    """Cumulative win rate of each decision array, stacked row-wise.
+
+    Shorter arrays are padded with NaN so their curves end where the data does.
+    """
+
+    max_length = max(len(array) for array in decisions)  # Find longest array
+
+    stacked = np.full((len(decisions), max_length), np.nan)
+    for i, array in enumerate(decisions):
+        stacked[i, :len(array)] = array
+
+    rewards = np.cumsum(stacked, axis=1)
+    return rewards / np.arange(1, max_length + 1)
+
+
 def plot_cumulative_reward(true_ctrs, decisions, alg_names, save_path):
     
     """Plot cumulative rewards over time."""
 
-    rewards = [None] * len(decisions)  # Pre-allocate list
-    win_rates = [None] * len(decisions)
+    win_rates = cumulative_win_rates(decisions)
+    max_length = win_rates.shape[1]
 
-    max_length = max(len(array) for array in decisions)  # Find longest array
-    
-    for i, array in enumerate(decisions):
-        rewards[i] = np.cumsum(array)
-        win_rates[i] = rewards[i] / (np.arange(len(array)) + 1)
-
-    plt.figure(figsize=(10, 6))
-    for i in range(len(win_rates)):
-        plt.plot(win_rates[i], label=alg_names[i])
-    plt.plot(np.ones(max_length)*np.max(true_ctrs), color="#e62c95", label="Optimal rate")
-    plt.axvline(x=600, color='black', linestyle=':', linewidth=0.5) # used for thmompson server
-    plt.ylim(0, 0.14)
-    plt.xlabel('Number of Trials')
-    plt.ylabel('Cumulative Reward')
-    plt.title('Learning Progress: Cumulative Reward Over Time')
-    plt.legend(loc='lower right')
-    plt.grid(True, alpha=0.3)
-    plt.xscale('log') # log scale for x axis
-    plt.savefig(Path(save_path) / 'cumulative_reward.png')
-    plt.close()
\ No newline at end of file
+    # Cheaper path rendering for the long reward curves, without touching global rcParams
+    with plt.rc_context({'path.simplify_threshold': 1.0, 'agg.path.chunksize': 10000}):
+        fig, ax = plt.subplots(figsize=(10, 6))
+        for i in range(len(win_rates)):
+            ax.plot(win_rates[i], label=alg_names[i])
+        ax.plot(np.ones(max_length)*np.max(true_ctrs), color="#e62c95", label="Optimal rate")
+        ax.axvline(x=600, color='black', linestyle=':', linewidth=0.5) # used for thmompson server
+        ax.set_ylim(0, 0.14)
+        ax.set_xlabel('Number of Trials')
+        ax.set_ylabel('Cumulative Reward')
+        ax.set_title('Learning Progress: Cumulative Reward Over Time')
+        ax.legend(loc='lower right')
+        ax.grid(True, alpha=0.3)
+        ax.set_xscale('log') # log scale for x axis
+        fig.savefig(Path(save_path) / 'cumulative_reward.png')
+    plt.close(fig)
\ No newline at end of file
@@ -1,26 +1,25 @@
 # classic_server.py
-from flask import Flask, jsonify, request
+from flask import Flask
+import atexit
 import logging
 from pathlib import Path
-import pandas as pd
 from models.bandits import ClassicABTest
-from analysis.performance import analyze_and_save_results
+from simulation.routes import register_routes
+from analysis.performance import analyze_and_save_results, save_decisions
 
 app = Flask(__name__)
-
-original_df = pd.read_csv("data/click_data.csv")
+logger = logging.getLogger(__name__)
+logging.getLogger('werkzeug').setLevel(logging.WARNING) # Silence per-request access logs
 
 method = "ab_test"
 variantA = ClassicABTest("A")
 variantB = ClassicABTest("B")
+BANDITS = {"A": variantA, "B": variantB}
 
-decisions = []
 current_assignment = "A"  # Start with A
 
-@app.route("/show")
-def show():
+def choose_button(n_views):
     global current_assignment
-    decisions.append(0)
 
     # Alternate between A and B
     if current_assignment == "A":
@@ -30,29 +29,30 @@ def show():
         variantB.add_view()
         current_assignment = "A"
            
-    logging.info(f"Showing button {current_assignment}")
-    return jsonify({"button": current_assignment})
-
-@app.route("/click_button", methods=["POST"])
-def click_button():
-    result = "OK"
-    if request.form["button"] == "A":
-        variantA.add_click()
-    elif request.form["button"] == "B":
-        variantB.add_click()
-    else:
-        result = "Invalid Input."
+    if logger.isEnabledFor(logging.INFO):
+        logger.info("Showing button %s", current_assignment)
+    return current_assignment
+
+def register_click(button):
+    variant = BANDITS.get(button)
+    if variant is None:
+        return "Invalid Input."
+    variant.add_click()
+    return "OK"
+
+view_log = register_routes(app, choose_button, register_click)
+
+# Save results when the process exits, whether it ran under app.run or a WSGI server
+@atexit.register
+def save_results():
+    if view_log.count == 0: # Imported but never served
+        return
+    save_decisions(view_log.outcomes(), 'ab_simulation_decisions')
+    analyze_and_save_results(variantA, variantB, method)
 
-    decisions[variantA.views + variantB.views - 1] = 1 
-    
-    return jsonify({"result": result})
-
-if __name__ == "__main__":
-    app.run(host="127.0.0.1", port="8888")
+    print(f"\nA: Clicks-{variantA.clicks}, Views-{variantA.views}, CTR-{variantA.clicks / variantA.views:.3f}")
+    print(f"\nB: Clicks-{variantB.clicks}, Views-{variantB.views}, CTR-{variantB.clicks / variantB.views:.3f}")
 
-    pd.Series(decisions).to_csv('data/ab_simulation_decisions.csv', index=False)
-    results = analyze_and_save_results(variantA, variantB, original_df, method)
-    pd.DataFrame(results).to_csv(f'data/{method}_results.csv', index=False)
 
-    print(f"\nA: Clicks-{variantA.clicks}, Views-{variantA.views}, CTR-{variantA.clicks / variantA.views:.3f}")
-    print(f"\nB: Clicks-{variantB.clicks}, Views-{variantB.views}, CTR-{variantB.clicks / variantB.views:.3f}")
\ No newline at end of file
+if __name__ == "__main__":
+    app.run(host="127.0.0.1", port="8888")
\ No newline at end of file
@@ -4,43 +4,53 @@ import pandas as pd
 
 # Set up paths and load data
 PROJECT_PATH = Path(__file__).parent.parent
-data_path = PROJECT_PATH / "data" / "click_data.csv"
+data_path = PROJECT_PATH / "data" / "click_data.feather"
+SERVER_URL = "http://localhost:8888"
+BATCH_SIZE = 64 # Buttons requested per round trip
+MAX_COUNT = 5000 # Bound on count, 5000 or 9400
 
 # Read and split data by button type
-df = pd.read_csv(data_path)
-a = df[df["button"] == "A"]
-b = df[df["button"] == "B"]
-a = a["action"].values
-b = b["action"].values
+df = pd.read_feather(data_path)
+actions = df.groupby("button", observed=True)["action"]
+a = actions.get_group("A").values
+b = actions.get_group("B").values
 
 # Print actual CTRs
 print("a.mean:", a.mean())
 print("b.mean:", b.mean())
 
+# Reuse one keep-alive connection for every request
+session = requests.Session()
 
 i = 0
 j = 0
 count = 0
-while (i < len(a) and j < len(b)) and count <= 5000: # 5000, 9400
-  # Get button recommendation from server
-  r = requests.get("http://localhost:8888/show")
+while (i < len(a) and j < len(b)) and count <= MAX_COUNT:
+  # Never request more buttons than the data or the trial budget can serve
+  n = min(BATCH_SIZE, MAX_COUNT - count + 1, len(a) - i, len(b) - j)
+  if n <= 0:
+    break
+
+  # Get a batch of button recommendations from server
+  r = session.get(f"{SERVER_URL}/show_batch", params={"n": n})
   r = r.json()
-  # Simulate user action
-  if r["button"] == "A":
-    action = a[i]
-    i += 1
-  else:
-    action = b[j]
-    j += 1
-
-  # Send click data if action is positive
-  if action == 1:
-    requests.post(
-      "http://localhost:8888/click_button",
-      data={"button": r["button"]}
-    )
+  if not r["buttons"]: # The server's trial budget is used up
+    break
+
+  # Simulate user actions
+  clicks = []
+  for button in r["buttons"]:
+    if button == "A":
+      action = a[i]
+      i += 1
+    else:
+      action = b[j]
+      j += 1
+    clicks.append((button, int(action)))
+
+  # Send click data for the whole batch
+  session.post(f"{SERVER_URL}/click_batch", json={"start": r["start"], "clicks": clicks})
 
   # Progress tracking
-  count += 1
-  if count % 50 == 0:
-    print(f"Seen {count} buttons, A: {i}, B: {j}")
\ No newline at end of file
+  count += len(r["buttons"])
+  print(f"Seen {count} buttons, A: {i}, B: {j}")
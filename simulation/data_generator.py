@@ -4,35 +4,40 @@ Creates synthetic click-through rate (CTR) data for two different buttons
 using the Bernoulli distribution to simulate user behavior.
 """
 
+import json
 import numpy as np
 import pandas as pd
 
-np.random.seed(42) # For reproducibility
+rng = np.random.default_rng(42) # For reproducibility
 
 N_SAMPLES = 20000 # Total number of views for both buttons
 CTR_A = 0.07 # True CTR for button A
 CTR_B = 0.10 # True CTR for button B
 
 # Generate binary click data
-clicks_a = np.random.binomial(n=1, p=CTR_A, size=N_SAMPLES//2) 
-clicks_b = np.random.binomial(n=1, p=CTR_B, size=N_SAMPLES//2)
+clicks_a = rng.binomial(n=1, p=CTR_A, size=N_SAMPLES//2) 
+clicks_b = rng.binomial(n=1, p=CTR_B, size=N_SAMPLES//2)
 
 # Create a DataFrame with button labels and their corresponding click actions
 df = pd.DataFrame(
-    {"button" : np.repeat(["A", "B"], N_SAMPLES//2),
-     "action" : np.concatenate([clicks_a, clicks_b])
+    {"button" : pd.Categorical(np.repeat(["A", "B"], N_SAMPLES//2)),
+     "action" : np.concatenate([clicks_a, clicks_b]).astype(np.uint8)
      }
 )
 
 # Shuffle the data
-df = df.sample(frac=1, random_state=42).reset_index(drop=True)
+df = df.sample(frac=1, random_state=rng).reset_index(drop=True)
 
-# Save to CSV
-df.to_csv("data/click_data.csv")
+# Save to Feather
+df.to_feather("data/click_data.feather")
 
-# Calculate the actual CTRs from the generated data
-actual_ctr_a = df.loc[df["button"]=="A"]["action"].mean()
-actual_ctr_b = df.loc[df["button"]=="B"]["action"].mean()
+# Calculate the actual CTRs from the generated data in a single grouped pass
+ctrs = df.groupby("button", observed=True, sort=False)["action"].mean()
+actual_ctr_a, actual_ctr_b = ctrs["A"], ctrs["B"]
+
+# Save the actual CTRs for the analysis step
+with open("data/true_ctrs.json", "w") as f:
+    json.dump({"ctr_a": actual_ctr_a, "ctr_b": actual_ctr_b}, f)
 
 print(f"Actual ctr for button A : {actual_ctr_a:.3f}")
 print(f"Actual ctr for button B : {actual_ctr_b:.3f}")
@@ -0,0 +1,15 @@
+"""
+Pre-encoded JSON responses for the fixed payloads of the simulation servers.
+Building a Response from ready-made bytes skips jsonify's dict-to-JSON encoding.
+"""
+
+from flask import Response
+
+_SHOW_BODIES = {button: f'{{"button":"{button}"}}\n'.encode() for button in ("A", "B")}
+_CLICK_BODIES = {result: f'{{"result":"{result}"}}\n'.encode() for result in ("OK", "Invalid Input.")}
+
+def show_response(button):
+    return Response(_SHOW_BODIES[button], mimetype="application/json")
+
+def click_response(result):
+    return Response(_CLICK_BODIES[result], mimetype="application/json")
@@ -0,0 +1,93 @@
+"""
+Flask routes shared by the simulation servers.
+A server supplies choose_button(n_views), which picks and counts one view, and
+register_click(button). register_routes wraps them in /show, /show_batch, /click_button
+and /click_batch and returns the ViewLog the server saves at shutdown.
+"""
+
+import threading
+import numpy as np
+from flask import jsonify, request
+from simulation.responses import show_response, click_response
+
+MAX_TRIALS = 20000 # Upper bound on views, the size of click_data
+
+class ViewLog:
+    """Button served and click outcome of every view, in serving order."""
+
+    def __init__(self, max_trials=MAX_TRIALS):
+        self.max_trials = max_trials
+        self.buttons = [""] * max_trials
+        self.decisions = np.zeros(max_trials, dtype=np.uint8)
+        self.count = 0 # Views served so far; also indexes the next view
+        # Handlers run on concurrent threads; serialize every read-modify-write of the shared state
+        self.lock = threading.Lock()
+
+    def outcomes(self):
+        return self.decisions[:self.count]
+
+def _invalid_input():
+    return click_response("Invalid Input."), 400
+
+def register_routes(app, choose_button, register_click):
+    """Add the simulation routes to app and return the ViewLog they fill."""
+    view_log = ViewLog()
+
+    def serve():
+        button = choose_button(view_log.count)
+        view_log.buttons[view_log.count] = button
+        view_log.count += 1
+        return button
+
+    @app.route("/show")
+    def show():
+        with view_log.lock:
+            if view_log.count >= view_log.max_trials:
+                return jsonify({"error": "Trial limit reached."}), 503
+            button = serve()
+        return show_response(button)
+
+    @app.route("/show_batch")
+    def show_batch():
+        n = request.args.get("n", 64, type=int)
+        with view_log.lock:
+            n = max(0, min(n, view_log.max_trials - view_log.count)) # Never serve past the log
+            start = view_log.count
+            buttons = [serve() for _ in range(n)]
+        return jsonify({"start": start, "buttons": buttons})
+
+    # Handle button click and update stats
+    @app.route("/click_button", methods=["POST"])
+    def click_button():
+        with view_log.lock:
+            if view_log.count == 0: # Nothing has been shown yet
+                return _invalid_input()
+            result = register_click(request.form["button"])
+            view_log.decisions[view_log.count - 1] = 1
+        return click_response(result)
+
+    @app.route("/click_batch", methods=["POST"])
+    def click_batch():
+        # Outcomes of a /show_batch call as (button, clicked) pairs, in order
+        payload = request.get_json(silent=True)
+        try:
+            start = payload["start"]
+            clicks = [(button, clicked) for button, clicked in payload["clicks"]]
+        except (KeyError, TypeError, ValueError):
+            return _invalid_input()
+        if type(start) is not int:
+            return _invalid_input()
+
+        with view_log.lock:
+            # Only views already served can be clicked, and only on the button they showed
+            if not 0 <= start <= view_log.count - len(clicks):
+                return _invalid_input()
+            if any(button != view_log.buttons[start + offset] for offset, (button, _) in enumerate(clicks)):
+                return _invalid_input()
+            for offset, (button, clicked) in enumerate(clicks):
+                if clicked:
+                    register_click(button)
+                    view_log.decisions[start + offset] = 1
+        return click_response("OK")
+
+    return view_log
@@ -1,78 +1,121 @@
+import argparse
+import atexit
 import logging
-from flask import Flask, jsonify, request
+import os
+from flask import Flask
 import numpy as np
-import pandas as pd
-from models.bandits import ThompsonBandit
+from models.bandits import BanditPool, ThompsonBandit
 from models.visualizations import BanditVisualizer
-from analysis.performance import analyze_and_save_results
+from simulation.routes import register_routes
+from analysis.performance import analyze_and_save_results, save_decisions
 
 app = Flask(__name__)
+logger = logging.getLogger(__name__)
+logging.getLogger('werkzeug').setLevel(logging.WARNING) # Silence per-request access logs
 
-original_df = pd.read_csv("data/click_data.csv")
+# Thompson variants as (a_prior, b_prior, minimum_exploration), picked with TS_METHOD or --method
+CONFIGS = {
+  "TS_min_exp": (1, 1, True), # Flat priors, random buttons for the first 600 views
+  "TS_priors": (6, 78, False), # Informed priors around the expected CTR
+  "TS_default": (1, 1, False), # Flat priors, no forced exploration
+}
+method = os.environ.get("TS_METHOD", "TS_min_exp")
+if __name__ == "__main__":
+  parser = argparse.ArgumentParser(description="Thompson sampling simulation server")
+  parser.add_argument("--method", choices=CONFIGS, default=method)
+  method = parser.parse_args().method
 
 # Initialize bandit instances
-method= "TS_min_exp"  #"TS_min_exp" # or "TS_priors"
-banditA = ThompsonBandit("A", a_prior=1, b_prior=1, minimum_exploration=True) # 6 78 False
-banditB = ThompsonBandit("B", a_prior=1, b_prior=1, minimum_exploration=True) # False
+a_prior, b_prior, minimum_exploration = CONFIGS[method]
+pool = BanditPool(2, a_prior=a_prior, b_prior=b_prior) # Arm 0 is button A, arm 1 is button B
+banditA = ThompsonBandit("A", a_prior, b_prior, minimum_exploration, pool=pool, index=0)
+banditB = ThompsonBandit("B", a_prior, b_prior, minimum_exploration, pool=pool, index=1)
+ARMS = {"A": 0, "B": 1} # Pool arm of each button
+rng = np.random.default_rng() # Uniform draws for the minimum exploration phase
 
 # Initialize the visualization tool
 visualizer = BanditVisualizer()
-snapshot_points = [50, 150, 500, 1500, 3000, 5000] # For posterior graphing
-decisions = []
+snapshot_points = frozenset({50, 150, 500, 1500, 3000, 5000}) # For posterior graphing
+snapshots = [] # Posterior parameters captured at the snapshot points, plotted at shutdown
+
+# Posterior samples are drawn in blocks and consumed one column per view. Views served from a
+# block use posteriors up to BUFFER_SIZE views or REFILL_CLICKS clicks old, which only slightly
+# delays exploitation since the posteriors move slowly.
+BUFFER_SIZE = 64 # Views served per refill
+REFILL_CLICKS = 5 # Clicks after which the block is redrawn early
+sample_buffer = [] # (sample_a, sample_b) pairs as Python floats
+buffer_idx = BUFFER_SIZE # Start exhausted so the first view fills it
+clicks_since_refill = 0
+
+def posterior_samples(n_views):
+  global sample_buffer, buffer_idx, clicks_since_refill
+  if buffer_idx == BUFFER_SIZE or clicks_since_refill >= REFILL_CLICKS:
+    sample_buffer = pool.sample(BUFFER_SIZE).T.tolist()
+    buffer_idx = 0
+    clicks_since_refill = 0
+  buffer_idx += 1
+  return sample_buffer[buffer_idx - 1]
 
-@app.route("/show")
-def show():
+def exploring_samples(n_views):
+  # Uniform draws pick the button at random for the first 600 views
+  if n_views < 600:
+    return rng.random(2).tolist()
+  return posterior_samples(n_views)
 
-  decisions.append(0)
-  n_views = banditA.views + banditB.views
-  minimum_explore = banditA.minimum_exploration and banditB.minimum_exploration # Check if exploration is True for both bandits
-  
+# Bound once, so runs without minimum exploration never check for it
+minimum_explore = banditA.minimum_exploration and banditB.minimum_exploration # Check if exploration is True for both bandits
+draw_samples = exploring_samples if minimum_explore else posterior_samples
+
+def choose_button(n_views):
   # Compare samples and select button to show
-  if minimum_explore and n_views < 600:
-    sample_a = np.random.random()
-    sample_b = np.random.random()
-  else:
-    sample_a = banditA.sample()
-    sample_b = banditB.sample()
+  sample_a, sample_b = draw_samples(n_views)
 
   if sample_a > sample_b: 
     button = "A"
-    banditA.add_view()
-    logging.info(f"Showing button A - Views: {banditA.views}")
+    pool.add_view(0)
+    if logger.isEnabledFor(logging.INFO):
+      logger.info("Showing button A - Views: %d", pool.views[0])
   else:
     button = "B"
-    banditB.add_view()
-    logging.info(f"Showing button B - Views: {banditB.views}")
+    pool.add_view(1)
+    if logger.isEnabledFor(logging.INFO):
+      logger.info("Showing button B - Views: %d", pool.views[1])
 
   if n_views in snapshot_points:
-    visualizer.plot_posterior(banditA, banditB, n_views, method)
-    
-  return jsonify({"button": button})
-
-# Handle button click and update stats
-@app.route("/click_button", methods=["POST"])
-def click_button():
-  result = "OK"
-  if request.form["button"] == "A":
-    banditA.add_click()
-    logging.info(f"Button A clicked - Clicks: {banditA.clicks}")
-  elif request.form["button"] == "B":
-    banditB.add_click()
-    logging.info(f"Button B clicked - Clicks: {banditB.clicks}")
-  else:
-    result = "Invalid Input."
+    snapshots.append(visualizer.snapshot(banditA, banditB, n_views))
 
-  decisions[banditA.views + banditB.views - 1] = 1
+  return button
 
-  return jsonify({"result": result})
+def register_click(button):
+  global clicks_since_refill
+  arm = ARMS.get(button)
+  if arm is None:
+    return "Invalid Input."
+  clicks_since_refill += 1
+  pool.add_click(arm)
+  if logger.isEnabledFor(logging.INFO):
+    logger.info("Button %s clicked - Clicks: %d", button, pool.clicks[arm])
+  return "OK"
 
+view_log = register_routes(app, choose_button, register_click)
 
-if __name__ == "__main__":
-  app.run(host="127.0.0.1", port="8888")
-  visualizer.create_grid(method=method, save_path='data/figures')
-  pd.Series(decisions).to_csv(f'data/{method}_decisions.csv', index=False) 
-  results = analyze_and_save_results(banditA, banditB, original_df, method)
-  pd.DataFrame(results).to_csv(f'data/{method}_results.csv', index=False)
+# Save results when the process exits, whether it ran under app.run or a WSGI server
+@atexit.register
+def save_results():
+  if view_log.count == 0: # Imported but never served
+    return
+  # Save the data before plotting, so a rendering error cannot lose the run
+  save_decisions(view_log.outcomes(), f'{method}_decisions')
+  analyze_and_save_results(banditA, banditB, method)
 
   print(f"\n A : Clicks-{banditA.clicks}, Views-{banditA.views}, CTR-{banditA.clicks / banditA.views:.3f}")
-  print(f"\n B : Clicks-{banditB.clicks}, Views-{banditB.views}, CTR-{banditB.clicks / banditB.views:.3f}")
\ No newline at end of file
+  print(f"\n B : Clicks-{banditB.clicks}, Views-{banditB.views}, CTR-{banditB.clicks / banditB.views:.3f}")
+
+  for snapshot in snapshots:
+    visualizer.plot_posterior(snapshot, method)
+  if snapshots:
+    visualizer.create_grid(method=method, snapshots=snapshots, save_path='data/figures')
+
+
+if __name__ == "__main__":
+  app.run(host="127.0.0.1", port="8888")
\ No newline at end of file
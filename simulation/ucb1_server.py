@@ -1,55 +1,59 @@
+import atexit
 import logging
-from flask import Flask, jsonify, request
+import math
+from flask import Flask
 from models.bandits import UCB1Bandit
-import pandas as pd
+from simulation.routes import MAX_TRIALS, register_routes
+from analysis.performance import save_decisions
 
 app = Flask(__name__)
+logger = logging.getLogger(__name__)
+logging.getLogger('werkzeug').setLevel(logging.WARNING) # Silence per-request access logs
 
 method = "UCB1"
 banditA = UCB1Bandit("A")
 banditB = UCB1Bandit("B") 
+BANDITS = {"A": banditA, "B": banditB}
 
-decisions = []
-
-@app.route("/show")
-def show():
-
-  decisions.append(0)
-  n_views = banditA.views + banditB.views
+LOG_TABLE = [0.0] + [math.log(n) for n in range(1, MAX_TRIALS + 3)] # log(n) for every reachable view total
 
+def choose_button(n_views):
   # Compare samples and select button to show
-  if banditA.sample(n_views) > banditB.sample(n_views): 
+  log_n = LOG_TABLE[n_views + 2] # Both arms start from one view
+  if banditA.sample_with_logn(log_n) > banditB.sample_with_logn(log_n): 
     button = "A"
     banditA.add_view()
-    logging.info(f"Showing button A - Views: {banditA.views}")
+    if logger.isEnabledFor(logging.INFO):
+      logger.info("Showing button A - Views: %d", banditA.views)
   else:
     button = "B"
     banditB.add_view()
-    logging.info(f"Showing button B - Views: {banditB.views}")
-
-  return jsonify({"button": button})
-
-# Handle button click and update stats
-@app.route("/click_button", methods=["POST"])
-def click_button():
-  result = "OK"
-  if request.form["button"] == "A":
-    banditA.add_click()
-    logging.info(f"Button A clicked - Clicks: {banditA.clicks}")
-  elif request.form["button"] == "B":
-    banditB.add_click()
-    logging.info(f"Button B clicked - Clicks: {banditB.clicks}")
-  else:
-    result = "Invalid Input."
+    if logger.isEnabledFor(logging.INFO):
+      logger.info("Showing button B - Views: %d", banditB.views)
 
-  decisions[banditA.views + banditB.views - 3] = 1
+  return button
 
-  return jsonify({"result": result})
+def register_click(button):
+  bandit = BANDITS.get(button)
+  if bandit is None:
+    return "Invalid Input."
+  bandit.add_click()
+  if logger.isEnabledFor(logging.INFO):
+    logger.info("Button %s clicked - Clicks: %d", button, bandit.clicks)
+  return "OK"
 
+view_log = register_routes(app, choose_button, register_click)
 
-if __name__ == "__main__":
-  app.run(host="127.0.0.1", port="8888")
-  pd.Series(decisions).to_csv(f'data/{method}_decisions.csv', index=False)
+# Save results when the process exits, whether it ran under app.run or a WSGI server
+@atexit.register
+def save_results():
+  if view_log.count == 0: # Imported but never served
+    return
+  save_decisions(view_log.outcomes(), f'{method}_decisions')
 
   print(f"\n A : Clicks-{banditA.clicks}, Views-{banditA.views}, CTR-{banditA.clicks / banditA.views}")
-  print(f"\n B : Clicks-{banditB.clicks}, Views-{banditB.views}, CTR-{banditB.clicks / banditB.views}")
\ No newline at end of file
+  print(f"\n B : Clicks-{banditB.clicks}, Views-{banditB.views}, CTR-{banditB.clicks / banditB.views}")
+
+
+if __name__ == "__main__":
+  app.run(host="127.0.0.1", port="8888")
\ No newline at end of file
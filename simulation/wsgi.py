@@ -0,0 +1,16 @@
+"""
+WSGI entry point for running a simulation server under gunicorn.
+
+Bandit state lives in process memory, so use a single worker with threads:
+
+    SIMULATION_SERVER=thompson gunicorn -w 1 -k gthread --threads 4 -b 127.0.0.1:8888 simulation.wsgi:app
+
+SIMULATION_SERVER selects the server: ab_test, thompson or ucb1. For the thompson
+server, TS_METHOD selects the variant: TS_min_exp, TS_priors or TS_default.
+"""
+
+import importlib
+import os
+
+server = os.environ.get("SIMULATION_SERVER", "thompson")
+app = importlib.import_module(f"simulation.{server}_server").app